@@ -10,10 +10,36 @@ from datetime import datetime
 import hashlib
 from concurrent.futures import ThreadPoolExecutor
 import threading
+import contextlib
+import json
+import queue
+import uuid
+import inspect
+import hmac
+import secrets
+import time
+import warnings
+import multiprocessing
+import zipfile
+import tarfile
+import tempfile
+import zlib
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from PIL import Image
 from io import StringIO
 import locale
 
+try:
+    import numpy as np
+except ImportError:  # 仅按颜色整理需要 numpy
+    np = None
+
+try:
+    from lzma import LZMAError
+except ImportError:  # 部分 Python 构建不包含 lzma
+    LZMAError = OSError
+
 # 检测系统语言
 def get_system_language():
     try:
@@ -35,7 +61,7 @@ LANGUAGES = {
         'source_dir': '源目录:',
         'browse': '浏览...',
         'mode': '整理模式:',
-        'modes': ['按大小', '按分辨率', '按日期', '按格式', '查找重复'],
+        'modes': ['按大小', '按分辨率', '按日期', '按格式', '查找重复', '组合整理', '按颜色', '校验完整性'],
         'size_threshold': '大小阈值(KB):',
         'resolution_threshold': '分辨率差阈值:',
         'max_files': '最大文件数:',
@@ -58,14 +84,21 @@ LANGUAGES = {
         'about_title': '关于',
         'about_content': '智能图片整理工具\n版本 1.0.0\n支持多种图片整理模式',
         'help_content': '帮助信息:\n1. 选择源目录\n2. 选择整理模式\n3. 设置参数\n4. 点击开始整理',
-        'resolution_tooltip': '分辨率差在设定值范围内的图片会被分到同一文件夹\n0表示精确匹配，10表示宽高差在10像素内的归为一组'
+        'resolution_tooltip': '分辨率差在设定值范围内的图片会被分到同一文件夹\n0表示精确匹配，10表示宽高差在10像素内的归为一组',
+        'composite_keys': '分类键(逗号分隔):',
+        'folder_template': '文件夹模板:',
+        'composite_tooltip': '可选键: format, date, resolution, size，按顺序生成多级文件夹\n模板可留空，例如 {format}/{date}/{resolution}',
+        'color_clusters': '颜色分组数:',
+        'verify_timeout': '单文件超时(秒):',
+        'move_corrupt': '移动损坏文件到 corrupt 文件夹',
+        'include_archives': '包含压缩包(zip/tar)内的图片'
     },
     'en': {
         'title': 'Smart Image Organizer',
         'source_dir': 'Source Directory:',
         'browse': 'Browse...',
         'mode': 'Organization Mode:',
-        'modes': ['By Size', 'By Resolution', 'By Date', 'By Format', 'Find Duplicates'],
+        'modes': ['By Size', 'By Resolution', 'By Date', 'By Format', 'Find Duplicates', 'Composite', 'By Color', 'Verify Integrity'],
         'size_threshold': 'Size Threshold(KB):',
         'resolution_threshold': 'Resolution Threshold:',
         'max_files': 'Max Files per Folder:',
@@ -88,7 +121,14 @@ LANGUAGES = {
         'about_title': 'About',
         'about_content': 'Smart Image Organizer\nVersion 1.0.0\nSupports multiple image organization modes',
         'help_content': 'Help Information:\n1. Select source directory\n2. Choose organization mode\n3. Set parameters\n4. Click Start Organization',
-        'resolution_tooltip': 'Images with resolution difference within the threshold will be grouped together\n0 means exact match, 10 means within 10 pixels difference'
+        'resolution_tooltip': 'Images with resolution difference within the threshold will be grouped together\n0 means exact match, 10 means within 10 pixels difference',
+        'composite_keys': 'Keys (comma separated):',
+        'folder_template': 'Folder Template:',
+        'composite_tooltip': 'Available keys: format, date, resolution, size, nested in the given order\nTemplate is optional, e.g. {format}/{date}/{resolution}',
+        'color_clusters': 'Color Groups:',
+        'verify_timeout': 'Timeout per File(s):',
+        'move_corrupt': 'Move corrupt files to corrupt folder',
+        'include_archives': 'Include images inside zip/tar archives'
     }
 }
 
@@ -110,11 +150,103 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def verify_image_file(file_path, full_decode=True):
+    """检查单个图片文件是否完整（在子进程中运行），返回 (状态, 错误信息)"""
+    # 超大图片直接视为损坏，避免解压炸弹占满内存
+    warnings.simplefilter('error', Image.DecompressionBombWarning)
+    try:
+        # 先只读文件头，再做格式自带的校验（PNG 会检查所有数据块的 CRC）
+        with Image.open(file_path) as img:
+            image_format = img.format
+            img.verify()
+
+        # verify() 不解码像素数据，其它格式需要完整解码一次
+        needs_decode = full_decode and image_format != 'PNG'
+
+        # JPEG 结束标记只作为提示：末尾附带数据（如动态照片）的文件也可能完好，缺失时以完整解码为准
+        if image_format in ('JPEG', 'MPO') and not needs_decode:
+            with open(file_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(f.tell() - 4096, 0))
+                tail = f.read().rstrip(b'\x00\r\n ')
+            needs_decode = not tail.endswith(b'\xff\xd9')
+
+        if needs_decode:
+            with Image.open(file_path) as img:
+                img.load()
+    except Exception as e:
+        return 'corrupt', f"{type(e).__name__}: {e}"
+    return 'ok', ''
+
+class MetadataCache:
+    """线程安全的元数据缓存，可在多个整理任务间共享"""
+    def __init__(self, max_entries=200000):
+        self.lock = threading.Lock()
+        self.max_entries = max_entries
+        self.entries = {}
+
+    def get(self, key):
+        with self.lock:
+            return self.entries.get(key)
+
+    def put(self, key, value):
+        with self.lock:
+            # 超出上限时丢弃最早的条目，限制常驻内存
+            if key not in self.entries and len(self.entries) >= self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+            self.entries[key] = value
+
 class ImageOrganizer:
-    def __init__(self):
+    def __init__(self, cache=None, io_semaphore=None, executor=None, io_concurrency=None):
         self.lock = threading.Lock()
         self.stop_requested = False
-        
+        # 以下资源可在多个任务间共享（服务模式）
+        self.cache = cache
+        self.io_semaphore = io_semaphore
+        self.executor = executor
+        self.io_concurrency = io_concurrency
+        self.progress = {'found': 0, 'moved': 0}
+
+    def io_slot(self):
+        """获取一个磁盘I/O并发名额"""
+        if self.io_semaphore is None:
+            return contextlib.nullcontext()
+        return self.io_semaphore
+
+    def _acquire_io_slot(self, timeout=None):
+        """手动获取I/O名额，未设置全局名额时总是成功"""
+        if self.io_semaphore is None:
+            return True
+        return self.io_semaphore.acquire(timeout=timeout)
+
+    def _release_io_slot(self):
+        if self.io_semaphore is not None:
+            self.io_semaphore.release()
+
+    def _map(self, func, items):
+        """在线程池中并行处理，优先使用共享线程池"""
+        if self.executor is not None:
+            return list(self.executor.map(func, items))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            return list(executor.map(func, items))
+
+    def _cached(self, kind, file_path, compute):
+        """按 (设备, inode, 大小, 修改时间) 缓存元数据，文件变化后自动失效"""
+        if self.cache is None:
+            return compute()
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return compute()
+        # 同一文件系统内移动文件只是改名，inode 不变，移动后缓存仍然有效
+        identity = (stat.st_dev, stat.st_ino) if stat.st_ino else file_path
+        key = (kind, identity, stat.st_size, stat.st_mtime_ns)
+        value = self.cache.get(key)
+        if value is None:
+            value = compute()
+            self.cache.put(key, value)
+        return value
+
     def get_image_size(self, file_path):
         """获取图片文件的大小（KB）"""
         try:
@@ -125,21 +257,25 @@ class ImageOrganizer:
 
     def get_image_dimensions(self, file_path):
         """获取图片分辨率"""
-        try:
-            with Image.open(file_path) as img:
-                return img.size  # (width, height)
-        except Exception as e:
-            logger.error(f"获取图片分辨率失败 {file_path}: {e}")
-            return (0, 0)
+        def compute():
+            try:
+                with self.io_slot(), Image.open(file_path) as img:
+                    return img.size  # (width, height)
+            except Exception as e:
+                logger.error(f"获取图片分辨率失败 {file_path}: {e}")
+                return (0, 0)
+        return self._cached('dimensions', file_path, compute)
 
     def get_image_hash(self, file_path):
         """计算图片的哈希值用于去重"""
-        try:
-            with open(file_path, 'rb') as f:
-                return hashlib.md5(f.read()).hexdigest()
-        except Exception as e:
-            logger.error(f"计算图片哈希值失败 {file_path}: {e}")
-            return None
+        def compute():
+            try:
+                with self.io_slot(), open(file_path, 'rb') as f:
+                    return hashlib.md5(f.read()).hexdigest()
+            except Exception as e:
+                logger.error(f"计算图片哈希值失败 {file_path}: {e}")
+                return None
+        return self._cached('hash', file_path, compute)
 
     def get_creation_date(self, file_path):
         """获取文件创建日期"""
@@ -150,8 +286,18 @@ class ImageOrganizer:
             logger.error(f"获取创建日期失败 {file_path}: {e}")
             return "unknown_date"
 
+    def _unique_path(self, dst):
+        """目标文件已存在时在文件名后追加序号"""
+        if os.path.exists(dst):
+            base, ext = os.path.splitext(dst)
+            counter = 1
+            while os.path.exists(f"{base}_{counter}{ext}"):
+                counter += 1
+            dst = f"{base}_{counter}{ext}"
+        return dst
+
     def safe_move(self, src, dst):
-        """安全的文件移动操作"""
+        """安全的文件移动操作，成功时返回实际的目标路径"""
         if self.stop_requested:
             return False
             
@@ -160,16 +306,13 @@ class ImageOrganizer:
             os.makedirs(os.path.dirname(dst), exist_ok=True)
             
             # 如果目标文件已存在，重命名
-            if os.path.exists(dst):
-                base, ext = os.path.splitext(dst)
-                counter = 1
-                while os.path.exists(f"{base}_{counter}{ext}"):
-                    counter += 1
-                dst = f"{base}_{counter}{ext}"
+            dst = self._unique_path(dst)
             
-            shutil.move(src, dst)
+            with self.io_slot():
+                shutil.move(src, dst)
+            self.progress['moved'] += 1
             logger.info(f"成功移动: {src} -> {dst}")
-            return True
+            return dst
             
         except PermissionError as e:
             logger.error(f"权限错误: 无法移动 {src} -> {dst}: {e}")
@@ -177,7 +320,43 @@ class ImageOrganizer:
             logger.error(f"移动文件失败 {src} -> {dst}: {e}")
         return False
 
-    def organize_images(self, source_dir, mode='size', **kwargs):
+    def safe_extract(self, fileobj, label, dst):
+        """将压缩包成员写入目标位置，成功时返回实际的目标路径"""
+        if self.stop_requested:
+            return False
+
+        part_path = None
+        try:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            dst = self._unique_path(dst)
+
+            # 先写入临时文件，完整写完后再改名，避免留下不完整的图片
+            part_path = dst + '.part'
+            with self.io_slot(), open(part_path, 'wb') as out:
+                shutil.copyfileobj(fileobj, out, 1024 * 1024)
+            os.replace(part_path, dst)
+            self.progress['moved'] += 1
+            logger.info(f"成功解压: {label} -> {dst}")
+            return dst
+
+        except PermissionError as e:
+            logger.error(f"权限错误: 无法解压 {label} -> {dst}: {e}")
+        except Exception as e:
+            logger.error(f"解压文件失败 {label} -> {dst}: {e}")
+
+        if part_path is not None:
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+        return False
+
+    image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'}
+    archive_extensions = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+    # 读取损坏的压缩包时可能出现的异常
+    archive_errors = (zipfile.BadZipFile, tarfile.TarError, zlib.error, LZMAError, EOFError, OSError)
+
+    def organize_images(self, source_dir, mode='size', include_archives=False, **kwargs):
         """
         整理图片的主函数
         """
@@ -185,41 +364,59 @@ class ImageOrganizer:
             logger.error(f"源目录不存在: {source_dir}")
             return False
 
-        self.stop_requested = False
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'}
+        # stop_requested 由调用方在开始前重置，避免覆盖已经发出的停止请求
+        self.progress = {'found': 0, 'moved': 0}
         image_files = []
+        archive_files = []
         
         logger.info(f"开始扫描目录: {source_dir}")
         
-        # 收集所有图片文件
+        # 收集所有图片文件（以及压缩包）
         for root, _, files in os.walk(source_dir):
             for file in files:
                 if self.stop_requested:
                     return False
-                if os.path.splitext(file.lower())[1] in image_extensions:
+                if os.path.splitext(file.lower())[1] in self.image_extensions:
                     file_path = os.path.join(root, file)
                     image_files.append(file_path)
+                elif include_archives and file.lower().endswith(self.archive_extensions):
+                    archive_files.append(os.path.join(root, file))
         
+        self.progress['found'] = len(image_files)
         logger.info(f"找到 {len(image_files)} 张图片")
+        if include_archives:
+            logger.info(f"找到 {len(archive_files)} 个压缩包")
         
-        if not image_files:
+        if not image_files and not archive_files:
             logger.warning("未找到图片文件")
             return True
 
         # 根据模式选择整理方法
-        mode_mapping = {
+        mode_mapping = self.mode_handlers()
+        
+        if mode not in mode_mapping:
+            logger.error(f"不支持的整理模式: {mode}")
+            return False
+
+        result = True
+        if image_files:
+            result = mode_mapping[mode](image_files, source_dir, **kwargs)
+        if result and archive_files:
+            result = self._organize_archives(archive_files, source_dir, mode, **kwargs)
+        return result
+
+    def mode_handlers(self):
+        """整理模式与对应方法的映射"""
+        return {
             'size': self._organize_by_size,
             'resolution': self._organize_by_resolution,
             'date': self._organize_by_date,
             'format': self._organize_by_format,
-            'duplicate': self._find_duplicates
+            'duplicate': self._find_duplicates,
+            'composite': self._organize_by_composite,
+            'color': self._organize_by_color,
+            'verify': self._verify_images
         }
-        
-        if mode in mode_mapping:
-            return mode_mapping[mode](image_files, source_dir, **kwargs)
-        else:
-            logger.error(f"不支持的整理模式: {mode}")
-            return False
 
     def _organize_by_size(self, image_files, source_dir, size_threshold=1000, max_files_per_folder=0):
         """按大小整理"""
@@ -413,11 +610,7 @@ class ImageOrganizer:
         duplicates = []
         
         # 多线程计算哈希值
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            results = list(executor.map(
-                lambda fp: (fp, self.get_image_hash(fp)), 
-                image_files
-            ))
+        results = self._map(lambda fp: (fp, self.get_image_hash(fp)), image_files)
         
         for file_path, file_hash in results:
             if self.stop_requested:
@@ -440,14 +633,795 @@ class ImageOrganizer:
                 target_path = os.path.join(duplicates_dir, filename)
                 self.safe_move(dup_file, target_path)
             logger.info(f"重复图片已移动到: {duplicates_dir}")
-        
+
         return True
-    
+
+    def _collect_metadata(self, file_path, keys):
+        """一次性读取组合整理所需的全部元数据"""
+        metadata = {}
+        _, ext = os.path.splitext(file_path)
+        metadata['format'] = ext.lower().lstrip('.')
+
+        # 大小和日期共用一次 stat
+        if 'size' in keys or 'date' in keys:
+            try:
+                stat = os.stat(file_path)
+                metadata['size'] = stat.st_size / 1024
+                metadata['date'] = datetime.fromtimestamp(stat.st_ctime).strftime('%Y-%m-%d')
+            except Exception as e:
+                logger.error(f"读取文件信息失败 {file_path}: {e}")
+                metadata['size'] = 0
+                metadata['date'] = "unknown_date"
+
+        # 只有需要分辨率时才打开图片（只读文件头）
+        if 'resolution' in keys:
+            metadata['resolution'] = self.get_image_dimensions(file_path)
+
+        return metadata
+
+    def _parse_keys(self, keys):
+        """解析组合整理的分类键，无效时返回 None"""
+        if isinstance(keys, str):
+            keys = [key.strip() for key in keys.split(',') if key.strip()]
+        keys = list(keys)
+
+        supported_keys = {'format', 'date', 'resolution', 'size'}
+        invalid_keys = [key for key in keys if key not in supported_keys]
+        if not keys or invalid_keys:
+            logger.error(f"不支持的分类键: {invalid_keys or keys}")
+            return None
+        return keys
+
+    def _check_template(self, folder_template, keys):
+        """开始整理前用示例值检查文件夹模板，无效时记录错误并返回 False"""
+        if not folder_template:
+            return True
+        try:
+            if os.path.isabs(folder_template):
+                raise ValueError("模板不能是绝对路径")
+            folder_template.format(**{key: key for key in keys})
+        except Exception as e:
+            logger.error(f"文件夹模板无效 {folder_template}: {type(e).__name__}: {e}")
+            return False
+        return True
+
+    def _composite_folder(self, metadata, keys, source_dir, folder_template=None, size_bucket=1000, resolution_bucket=0):
+        """根据元数据和分类键生成 source_dir 下的多级目标文件夹"""
+        values = {}
+        folders = []
+        for key in keys:
+            if key == 'format':
+                value = metadata['format']
+            elif key == 'date':
+                value = metadata['date']
+            elif key == 'size':
+                bucket = max(size_bucket, 1)
+                low = int(metadata['size'] // bucket * bucket)
+                value = f"{low}-{low + int(bucket)}KB"
+            else:
+                width, height = metadata['resolution']
+                if (width, height) == (0, 0):
+                    value = "unknown_resolution"
+                elif resolution_bucket > 0:
+                    value = f"{width // resolution_bucket * resolution_bucket}x{height // resolution_bucket * resolution_bucket}"
+                else:
+                    value = f"{width}x{height}"
+            values[key] = value
+            folders.append(f"{key}_{value}")
+
+        if folder_template:
+            if os.path.isabs(folder_template):
+                raise ValueError("模板不能是绝对路径")
+            folder = os.path.join(source_dir, os.path.normpath(folder_template.format(**values)))
+        else:
+            folder = os.path.join(source_dir, *folders)
+
+        # 目标文件夹必须位于源目录之内
+        root = os.path.realpath(source_dir)
+        if os.path.commonpath([root, os.path.realpath(folder)]) != root:
+            raise ValueError(f"目标文件夹超出源目录: {folder}")
+        return folder
+
+    def _organize_by_composite(self, image_files, source_dir, keys=('format', 'date', 'resolution'),
+                               folder_template=None, size_bucket=1000, resolution_bucket=0,
+                               max_files_per_folder=0):
+        """按多个键组合整理，每个文件只读取一次元数据、只移动一次"""
+        keys = self._parse_keys(keys)
+        if keys is None or not self._check_template(folder_template, keys):
+            return False
+
+        logger.info(f"开始组合整理图片: {'/'.join(keys)}")
+
+        # 多线程读取元数据，每个文件只处理一次
+        results = self._map(lambda fp: (fp, self._collect_metadata(fp, keys)), image_files)
+
+        folder_groups = {}
+        for file_path, metadata in results:
+            if self.stop_requested:
+                return False
+            try:
+                folder = self._composite_folder(metadata, keys, source_dir, folder_template,
+                                                size_bucket, resolution_bucket)
+            except (KeyError, IndexError, ValueError) as e:
+                logger.error(f"文件夹模板无效 {folder_template}: {e}")
+                return False
+            if folder not in folder_groups:
+                folder_groups[folder] = []
+            folder_groups[folder].append(file_path)
+
+        logger.info(f"组合分组完成，共 {len(folder_groups)} 个分组")
+
+        for target_dir, files in folder_groups.items():
+            if self.stop_requested:
+                return False
+
+            for j, file_path in enumerate(files):
+                if self.stop_requested:
+                    return False
+
+                # 如果设置了最大文件数限制，创建子文件夹
+                if max_files_per_folder > 0:
+                    sub_folder = os.path.join(target_dir, f"group_{j//max_files_per_folder + 1}")
+                else:
+                    sub_folder = target_dir
+
+                filename = os.path.basename(file_path)
+                target_path = os.path.join(sub_folder, filename)
+                self.safe_move(file_path, target_path)
+
+        logger.info("组合整理完成")
+        return True
+
+    def _iter_archive_members(self, archive_path):
+        """按存储顺序依次读取压缩包中的图片，返回 (成员名, 大小, 修改时间, 文件对象)"""
+        if zipfile.is_zipfile(archive_path):
+            with zipfile.ZipFile(archive_path) as zf:
+                # 按数据在文件中的位置排序，保证顺序读取
+                for info in sorted(zf.infolist(), key=lambda i: i.header_offset):
+                    if info.is_dir() or os.path.splitext(info.filename.lower())[1] not in self.image_extensions:
+                        continue
+                    try:
+                        mtime = datetime(*info.date_time).timestamp()
+                    except ValueError:
+                        mtime = None
+                    try:
+                        fileobj = zf.open(info)
+                    except Exception as e:
+                        logger.error(f"读取压缩包成员失败 {archive_path}!{info.filename}: {e}")
+                        continue
+                    with fileobj:
+                        yield info.filename, info.file_size, mtime, fileobj
+        else:
+            # 流式模式只能顺序读取，不会来回定位
+            with tarfile.open(archive_path, 'r|*') as tf:
+                for member in tf:
+                    if not member.isfile() or os.path.splitext(member.name.lower())[1] not in self.image_extensions:
+                        continue
+                    yield member.name, member.size, member.mtime, tf.extractfile(member)
+
+    def _index_existing_images(self, source_dir):
+        """按文件大小索引源目录中已有的图片"""
+        by_size = {}
+        for root, _, files in os.walk(source_dir):
+            for file in files:
+                if os.path.splitext(file.lower())[1] in self.image_extensions:
+                    file_path = os.path.join(root, file)
+                    try:
+                        by_size.setdefault(os.path.getsize(file_path), []).append(file_path)
+                    except OSError:
+                        pass
+        return by_size
+
+    def _organize_archives(self, archive_files, source_dir, mode, keys=('format', 'date', 'resolution'),
+                           folder_template=None, size_bucket=1000, resolution_bucket=0,
+                           move_to_folder=True, **kwargs):
+        """把压缩包当作虚拟目录：每个压缩包只顺序读取一遍，只解压磁盘上还没有的图片"""
+        if mode in ('format', 'date'):
+            keys, folder_template = [mode], None
+        elif mode == 'composite':
+            keys = self._parse_keys(keys)
+            if keys is None or not self._check_template(folder_template, keys):
+                return False
+        elif mode == 'duplicate':
+            # 不重复的图片解压到与压缩包同名的文件夹，重复的只记录不解压
+            keys = None
+        else:
+            # 其它模式需要先比较全部图片才能决定去向
+            logger.warning(f"整理模式 {mode} 暂不支持压缩包，已跳过 {len(archive_files)} 个压缩包")
+            return True
+
+        # 已有图片按大小索引，只有大小相同时才计算哈希
+        existing = self._index_existing_images(source_dir)
+        known_hashes = {}
+
+        def hashes_of_size(size):
+            if size not in known_hashes:
+                hashes = (self.get_image_hash(file_path) for file_path in existing.get(size, []))
+                known_hashes[size] = {file_hash for file_hash in hashes if file_hash}
+            return known_hashes[size]
+
+        failed = False
+        duplicate_count = 0
+        for archive_path in archive_files:
+            if self.stop_requested:
+                return False
+            logger.info(f"开始处理压缩包: {archive_path}")
+
+            try:
+                for name, size, mtime, fileobj in self._iter_archive_members(archive_path):
+                    if self.stop_requested:
+                        return False
+                    label = f"{archive_path}!{name}"
+                    filename = name.replace('\\', '/').rsplit('/', 1)[-1]
+
+                    # 顺序读取成员并计算哈希，内容暂存在内存中（过大时溢出到临时文件）
+                    with tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024) as spool:
+                        md5 = hashlib.md5()
+                        try:
+                            for chunk in iter(lambda: fileobj.read(1024 * 1024), b''):
+                                md5.update(chunk)
+                                spool.write(chunk)
+                        except self.archive_errors as e:
+                            # 单个成员损坏时跳过，继续处理后面的成员
+                            logger.error(f"读取压缩包成员失败 {label}: {e}")
+                            failed = True
+                            continue
+                        file_hash = md5.hexdigest()
+                        data_size = spool.tell()
+
+                        if file_hash in hashes_of_size(data_size):
+                            duplicate_count += 1
+                            logger.info(f"已存在相同图片，跳过解压: {label}")
+                            continue
+
+                        if keys is None:
+                            if not move_to_folder:
+                                hashes_of_size(data_size).add(file_hash)
+                                continue
+                            archive_name = os.path.basename(archive_path)
+                            for ext in sorted(self.archive_extensions, key=len, reverse=True):
+                                if archive_name.lower().endswith(ext):
+                                    archive_name = archive_name[:-len(ext)]
+                                    break
+                            folder = os.path.join(os.path.dirname(archive_path), archive_name)
+                        else:
+                            metadata = {
+                                'format': os.path.splitext(filename)[1].lower().lstrip('.'),
+                                'size': data_size / 1024,
+                                'date': "unknown_date"
+                            }
+                            try:
+                                metadata['date'] = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d')
+                            except (TypeError, ValueError, OSError):
+                                pass
+
+                            if 'resolution' in keys:
+                                spool.seek(0)
+                                try:
+                                    with Image.open(spool) as img:
+                                        metadata['resolution'] = img.size
+                                except Exception as e:
+                                    logger.error(f"获取图片分辨率失败 {label}: {e}")
+                                    metadata['resolution'] = (0, 0)
+
+                            try:
+                                folder = self._composite_folder(metadata, keys, source_dir, folder_template,
+                                                                size_bucket, resolution_bucket)
+                            except (KeyError, IndexError, ValueError) as e:
+                                logger.error(f"文件夹模板无效 {folder_template}: {e}")
+                                return False
+
+                        spool.seek(0)
+                        if self.safe_extract(spool, label, os.path.join(folder, filename)):
+                            hashes_of_size(data_size).add(file_hash)
+                        else:
+                            failed = True
+            except self.archive_errors as e:
+                logger.error(f"读取压缩包失败 {archive_path}: {e}")
+                failed = True
+
+        logger.info(f"压缩包处理完成，跳过 {duplicate_count} 张已存在的图片")
+        return not failed
+
+    hue_names = ['red', 'orange', 'yellow', 'lime', 'green', 'spring',
+                 'cyan', 'azure', 'blue', 'violet', 'magenta', 'rose']
+
+    def get_color_feature(self, file_path):
+        """从缩小解码的图片计算颜色直方图特征，返回 (特征, 是否灰度)"""
+        return self._cached('color', file_path, lambda: self._compute_color_feature(file_path))
+
+    def _compute_color_feature(self, file_path):
+        try:
+            # 只在打开、读取和解码文件时占用I/O名额，后续转换属于CPU计算
+            with self.io_slot():
+                img = Image.open(file_path)
+                try:
+                    # JPEG 直接按缩小比例解码，其它格式解码后再整数倍缩小
+                    img.draft('RGB', (64, 64))
+                    img.load()
+                except Exception:
+                    img.close()
+                    raise
+            with img:
+                img = img.convert('RGB')
+                factor = max(1, min(img.size) // 32)
+                if factor > 1:
+                    img = img.reduce(factor)
+                hsv = np.asarray(img.convert('HSV'), dtype=np.float32).reshape(-1, 3) / 255.0
+        except Exception as e:
+            logger.error(f"读取图片颜色失败 {file_path}: {e}")
+            return None, False
+
+        hue, saturation, value = hsv[:, 0], hsv[:, 1], hsv[:, 2]
+        weights = saturation * value
+        is_grayscale = float(np.mean(saturation > 0.15)) < 0.05
+
+        # 12 个色相区间（按饱和度*亮度加权）+ 4 个亮度区间
+        hue_bins = np.minimum((hue * 12).astype(np.int64), 11)
+        hue_hist = np.bincount(hue_bins, weights=weights, minlength=12)
+        value_bins = np.minimum((value * 4).astype(np.int64), 3)
+        value_hist = np.bincount(value_bins, minlength=4).astype(np.float64)
+
+        hue_hist /= max(hue_hist.sum(), 1e-6)
+        value_hist /= max(value_hist.sum(), 1e-6)
+        feature = np.concatenate([hue_hist, value_hist * 0.5]).astype(np.float32)
+        return feature, is_grayscale
+
+    def _nearest_centers(self, features, centers):
+        """向量化计算每个特征最近的聚类中心"""
+        distances = (np.einsum('ij,ij->i', features, features)[:, None]
+                     - 2 * features @ centers.T
+                     + np.einsum('ij,ij->i', centers, centers)[None, :])
+        return np.argmin(distances, axis=1)
+
+    def _minibatch_kmeans(self, features, n_clusters, batch_size=1024, iterations=100, seed=0):
+        """小批量 k-means，每轮只处理一个随机批次，内存占用与图片数量无关"""
+        rng = np.random.default_rng(seed)
+        count = len(features)
+        centers = features[rng.choice(count, n_clusters, replace=False)].copy()
+        totals = np.zeros(n_clusters)
+
+        for _ in range(iterations):
+            if self.stop_requested:
+                break
+            batch = features[rng.integers(0, count, min(batch_size, count))]
+            labels = self._nearest_centers(batch, centers)
+            batch_counts = np.bincount(labels, minlength=n_clusters)
+            sums = np.zeros_like(centers)
+            np.add.at(sums, labels, batch)
+
+            updated = batch_counts > 0
+            totals[updated] += batch_counts[updated]
+            rate = (batch_counts[updated] / totals[updated])[:, None]
+            means = sums[updated] / batch_counts[updated][:, None]
+            centers[updated] += rate * (means - centers[updated])
+
+        return centers
+
+    def _organize_by_color(self, image_files, source_dir, color_clusters=8, max_files_per_folder=0, chunk_size=4096):
+        """按颜色整理：灰度图片单独分组，彩色图片按颜色直方图聚类"""
+        if np is None:
+            logger.error("按颜色整理需要安装 numpy")
+            return False
+
+        logger.info("开始按颜色整理图片...")
+
+        # 分块并行提取特征，写入预分配的矩阵
+        features = np.zeros((len(image_files), 16), dtype=np.float32)
+        color_files = []
+        grayscale_files = []
+        for start in range(0, len(image_files), chunk_size):
+            if self.stop_requested:
+                return False
+            chunk = image_files[start:start + chunk_size]
+            results = self._map(lambda fp: (fp, self.get_color_feature(fp)), chunk)
+            for file_path, (feature, is_grayscale) in results:
+                if feature is None:
+                    continue
+                if is_grayscale:
+                    grayscale_files.append(file_path)
+                else:
+                    features[len(color_files)] = feature
+                    color_files.append(file_path)
+        features = features[:len(color_files)]
+
+        folder_groups = {}
+        if grayscale_files:
+            folder_groups["color_grayscale"] = grayscale_files
+
+        if color_files:
+            n_clusters = max(1, min(color_clusters, len(color_files)))
+            centers = self._minibatch_kmeans(features, n_clusters)
+            if self.stop_requested:
+                return False
+
+            labels = np.concatenate([
+                self._nearest_centers(features[start:start + chunk_size], centers)
+                for start in range(0, len(color_files), chunk_size)
+            ])
+
+            # 按主色相排序命名，使文件夹名称稳定
+            dominant_hues = np.argmax(centers[:, :12], axis=1)
+            order = np.argsort(dominant_hues, kind='stable')
+            for rank, cluster in enumerate(order):
+                members = np.flatnonzero(labels == cluster)
+                if len(members) == 0:
+                    continue
+                folder_name = f"color_{rank + 1}_{self.hue_names[dominant_hues[cluster]]}"
+                folder_groups[folder_name] = [color_files[i] for i in members]
+
+        logger.info(f"按颜色分组完成，共 {len(folder_groups)} 个分组")
+
+        for folder_name, files in folder_groups.items():
+            if self.stop_requested:
+                return False
+            target_dir = os.path.join(source_dir, folder_name)
+
+            for j, file_path in enumerate(files):
+                if self.stop_requested:
+                    return False
+
+                # 如果设置了最大文件数限制，创建子文件夹
+                if max_files_per_folder > 0:
+                    sub_folder = os.path.join(target_dir, f"group_{j//max_files_per_folder + 1}")
+                else:
+                    sub_folder = target_dir
+
+                filename = os.path.basename(file_path)
+                target_path = os.path.join(sub_folder, filename)
+                self.safe_move(file_path, target_path)
+
+        logger.info("按颜色整理完成")
+        return True
+
+    def _new_verify_pool(self, workers):
+        """创建校验用的进程池"""
+        # 使用 spawn 启动子进程：服务模式下进程中有多个线程，fork 可能复制到被占用的锁导致子进程卡死
+        pool = multiprocessing.get_context('spawn').Pool(workers)
+        # 等待子进程完成启动，避免启动耗时被计入单文件超时
+        pool.map(time.sleep, [0] * workers, chunksize=1)
+        return pool
+
+    def _verify_images(self, image_files, source_dir, timeout=30, workers=0, full_decode=True, move_to_folder=True):
+        """多进程校验图片完整性，损坏或超时的图片移动到 corrupt 文件夹"""
+        logger.info("开始校验图片完整性...")
+
+        # 已隔离的文件不再重复校验和移动
+        corrupt_dir = os.path.join(source_dir, "corrupt")
+        corrupt_root = os.path.realpath(corrupt_dir)
+        quarantined = {file_path for file_path in image_files
+                       if os.path.commonpath([corrupt_root, os.path.realpath(file_path)]) == corrupt_root}
+        if quarantined:
+            logger.info(f"跳过 corrupt 文件夹中已隔离的 {len(quarantined)} 张图片")
+            image_files = [file_path for file_path in image_files if file_path not in quarantined]
+
+        workers = workers or os.cpu_count() or 1
+        # 服务模式下同时进行的任务数受全局I/O名额限制，多余的进程没有意义
+        if self.io_concurrency:
+            workers = min(workers, self.io_concurrency)
+        pending = deque(image_files)
+        in_flight = {}
+        results = {}
+        pool = self._new_verify_pool(workers)
+
+        try:
+            while pending or in_flight:
+                if self.stop_requested:
+                    return False
+
+                # 同时最多只提交 workers 个任务，保证超时从开始处理时算起
+                while pending and len(in_flight) < workers:
+                    # 每个任务占用一个全局I/O名额（服务模式），拿不到名额时先处理已提交的任务
+                    if not self._acquire_io_slot(timeout=0 if in_flight else 0.5):
+                        break
+                    file_path = pending.popleft()
+                    task = pool.apply_async(verify_image_file, (file_path, full_decode))
+                    in_flight[file_path] = (task, time.monotonic() + timeout)
+
+                if not in_flight:
+                    continue
+                next(iter(in_flight.values()))[0].wait(0.05)
+
+                now = time.monotonic()
+                timed_out = []
+                for file_path, (task, deadline) in list(in_flight.items()):
+                    if task.ready():
+                        try:
+                            results[file_path] = task.get()
+                        except Exception as e:
+                            results[file_path] = ('corrupt', f"{type(e).__name__}: {e}")
+                        del in_flight[file_path]
+                        self._release_io_slot()
+                    elif now > deadline:
+                        timed_out.append(file_path)
+
+                if timed_out:
+                    # 卡住的子进程无法单独结束，重建进程池并重新提交其余任务
+                    for file_path in timed_out:
+                        logger.error(f"校验超时 {file_path}: 超过 {timeout} 秒")
+                        results[file_path] = ('timeout', f"超过 {timeout} 秒未完成")
+                        del in_flight[file_path]
+                        self._release_io_slot()
+                    pool.terminate()
+                    pool.join()
+                    pending.extendleft(in_flight.keys())
+                    for _ in in_flight:
+                        self._release_io_slot()
+                    in_flight.clear()
+                    pool = self._new_verify_pool(workers)
+        finally:
+            pool.terminate()
+            pool.join()
+            for _ in in_flight:
+                self._release_io_slot()
+
+        failures = [file_path for file_path in image_files if results[file_path][0] != 'ok']
+        logger.info(f"校验完成，共 {len(image_files)} 张图片，{len(failures)} 张损坏或超时")
+
+        report = []
+        for file_path in image_files:
+            status, error = results[file_path]
+            entry = {'file': file_path, 'status': status, 'error': error, 'moved_to': None}
+            if status != 'ok':
+                logger.error(f"图片损坏 {file_path}: {error}")
+                if move_to_folder and not self.stop_requested:
+                    target_path = os.path.join(corrupt_dir, os.path.basename(file_path))
+                    entry['moved_to'] = self.safe_move(file_path, target_path) or None
+            report.append(entry)
+
+        report_path = os.path.join(source_dir, "verify_report.json")
+        try:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'checked': len(image_files),
+                    'failed': len(failures),
+                    'files': report
+                }, f, ensure_ascii=False, indent=2)
+            logger.info(f"校验报告已生成: {report_path}")
+        except Exception as e:
+            logger.error(f"写入校验报告失败 {report_path}: {e}")
+
+        return True
+
     def stop(self):
         """停止当前操作"""
         self.stop_requested = True
         logger.info("停止操作请求已发送")
 
+class OrganizerDaemon:
+    """常驻服务：通过本地 HTTP/JSON 接口接收整理任务并排队执行"""
+    def __init__(self, host='127.0.0.1', port=8765, max_jobs=2, queue_size=16, io_concurrency=4,
+                 max_finished_jobs=200, token=None):
+        self.host = host
+        self.port = port
+        # 每次启动生成的访问令牌，请求需带 Authorization: Bearer <令牌>
+        self.token = token or secrets.token_urlsafe(32)
+        self.lock = threading.Lock()
+        self.jobs = {}
+        # 已结束任务只保留最近的若干个，避免常驻服务内存持续增长
+        self.max_finished_jobs = max_finished_jobs
+        self.job_queue = queue.Queue(maxsize=queue_size)
+        # 所有任务共享的资源：元数据缓存、I/O并发名额和线程池
+        self.cache = MetadataCache()
+        self.io_concurrency = io_concurrency
+        self.io_semaphore = threading.BoundedSemaphore(io_concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=max(io_concurrency, 4))
+        self.workers = [
+            threading.Thread(target=self._worker, daemon=True)
+            for _ in range(max_jobs)
+        ]
+        self.server = None
+
+    def submit(self, params):
+        """提交任务，队列已满时返回 None，参数无效时抛出 ValueError"""
+        if not isinstance(params, dict) or 'source_dir' not in params:
+            raise ValueError("缺少参数 source_dir")
+
+        organizer = ImageOrganizer(cache=self.cache, io_semaphore=self.io_semaphore,
+                                   executor=self.executor, io_concurrency=self.io_concurrency)
+        handlers = organizer.mode_handlers()
+        mode = params.get('mode', 'size')
+        if mode not in handlers:
+            raise ValueError(f"不支持的整理模式: {mode}")
+
+        # 只接受该模式方法声明的参数
+        accepted = set(inspect.signature(handlers[mode]).parameters) - {'image_files', 'source_dir'}
+        accepted |= {'source_dir', 'mode', 'include_archives'}
+        unknown = sorted(set(params) - accepted)
+        if unknown:
+            raise ValueError(f"模式 {mode} 不支持参数: {', '.join(unknown)}")
+
+        job = {
+            'id': uuid.uuid4().hex,
+            'params': params,
+            'status': 'queued',
+            'result': None,
+            'error': None,
+            'submitted': datetime.now().isoformat(timespec='seconds'),
+            'progress': {'found': 0, 'moved': 0},
+            'organizer': organizer
+        }
+        with self.lock:
+            try:
+                self.job_queue.put_nowait(job['id'])
+            except queue.Full:
+                return None
+            self.jobs[job['id']] = job
+        logger.info(f"任务已提交: {job['id']} {params}")
+        return job['id']
+
+    def status(self, job_id=None):
+        """查询单个或全部任务的状态和进度"""
+        with self.lock:
+            if job_id is not None:
+                job = self.jobs.get(job_id)
+                return self._describe(job) if job else None
+            return [self._describe(job) for job in self.jobs.values()]
+
+    def cancel(self, job_id):
+        """取消排队中或正在运行的任务"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return False
+            if job['status'] == 'queued':
+                self._finish(job, 'cancelled')
+            elif job['status'] == 'running':
+                job['status'] = 'cancelling'
+                job['organizer'].stop()
+        logger.info(f"任务取消请求已发送: {job_id}")
+        return True
+
+    def _finish(self, job, status):
+        """记录任务结束状态，释放整理器并清理过多的已结束任务（需持有锁）"""
+        if job['organizer'] is not None:
+            job['progress'] = dict(job['organizer'].progress)
+            job['organizer'] = None
+        job['status'] = status
+
+        finished = [job_id for job_id, item in self.jobs.items()
+                    if item['status'] in ('done', 'failed', 'cancelled')]
+        for job_id in finished[:max(len(finished) - self.max_finished_jobs, 0)]:
+            del self.jobs[job_id]
+
+    def _describe(self, job):
+        organizer = job['organizer']
+        return {
+            'id': job['id'],
+            'status': job['status'],
+            'params': job['params'],
+            'progress': dict(organizer.progress) if organizer is not None else job['progress'],
+            'result': job['result'],
+            'error': job['error'],
+            'submitted': job['submitted']
+        }
+
+    def _worker(self):
+        while True:
+            job_id = self.job_queue.get()
+            with self.lock:
+                job = self.jobs.get(job_id)
+                # 排队时已取消（可能已被清理）的任务直接跳过
+                if job is None or job['status'] == 'cancelled':
+                    self.job_queue.task_done()
+                    continue
+                job['status'] = 'running'
+
+            try:
+                params = dict(job['params'])
+                result = job['organizer'].organize_images(params.pop('source_dir'), **params)
+                error = None
+            except Exception as e:
+                logger.error(f"任务执行失败 {job_id}: {e}")
+                result, error = False, str(e)
+
+            with self.lock:
+                job['result'] = result
+                job['error'] = error
+                if job['status'] == 'cancelling':
+                    self._finish(job, 'cancelled')
+                else:
+                    self._finish(job, 'done' if result else 'failed')
+            self.job_queue.task_done()
+
+    def serve_forever(self):
+        """启动工作线程和 HTTP 服务"""
+        daemon = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def _send_json(self, code, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _parts(self):
+                return [part for part in self.path.split('?')[0].split('/') if part]
+
+            def _authorized(self):
+                """检查 Host/Origin 和访问令牌，拒绝网页跨域请求和 DNS 重绑定"""
+                port = daemon.server.server_address[1]
+                hosts = {f"{daemon.host}:{port}"}
+                if daemon.host in ('127.0.0.1', 'localhost', '::1'):
+                    hosts |= {f"127.0.0.1:{port}", f"localhost:{port}", f"[::1]:{port}"}
+                if self.headers.get('Host') not in hosts:
+                    self._send_json(403, {'error': 'invalid host'})
+                    return False
+                origin = self.headers.get('Origin')
+                if origin is not None and origin not in {f"http://{host}" for host in hosts}:
+                    self._send_json(403, {'error': 'invalid origin'})
+                    return False
+                auth = self.headers.get('Authorization', '')
+                if not hmac.compare_digest(auth.encode('utf-8'), f"Bearer {daemon.token}".encode('utf-8')):
+                    self._send_json(401, {'error': 'invalid token'})
+                    return False
+                return True
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                parts = self._parts()
+                if parts == ['jobs']:
+                    self._send_json(200, daemon.status())
+                elif len(parts) == 2 and parts[0] == 'jobs':
+                    job = daemon.status(parts[1])
+                    if job is None:
+                        self._send_json(404, {'error': 'job not found'})
+                    else:
+                        self._send_json(200, job)
+                else:
+                    self._send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if not self._authorized():
+                    return
+                # 只接受 JSON，浏览器无法不经预检直接跨域发送此类请求
+                content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                if content_type != 'application/json':
+                    self._send_json(415, {'error': 'Content-Type must be application/json'})
+                    return
+                parts = self._parts()
+                if parts == ['jobs']:
+                    try:
+                        length = int(self.headers.get('Content-Length', 0))
+                        params = json.loads(self.rfile.read(length) or b'{}')
+                        job_id = daemon.submit(params)
+                    except ValueError as e:
+                        self._send_json(400, {'error': str(e)})
+                        return
+                    if job_id is None:
+                        self._send_json(503, {'error': 'queue full'})
+                    else:
+                        self._send_json(202, {'id': job_id})
+                elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'cancel':
+                    if daemon.cancel(parts[1]):
+                        self._send_json(200, daemon.status(parts[1]))
+                    else:
+                        self._send_json(404, {'error': 'job not found'})
+                else:
+                    self._send_json(404, {'error': 'not found'})
+
+            def log_message(self, format, *args):
+                logger.info(f"{self.address_string()} - {format % args}")
+
+        for worker in self.workers:
+            worker.start()
+        self.server = ThreadingHTTPServer((self.host, self.port), RequestHandler)
+        logger.info(f"整理服务已启动: http://{self.host}:{self.server.server_address[1]}")
+        logger.info(f"访问令牌: {self.token}")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            self.executor.shutdown(wait=False)
+
+    def shutdown(self):
+        """停止 HTTP 服务"""
+        if self.server is not None:
+            self.server.shutdown()
+
 class ImageOrganizerGUI:
     def __init__(self, root):
         self.root = root
@@ -506,7 +1480,7 @@ class ImageOrganizerGUI:
         # 更新模式选择框
         current_mode = self.mode_var.get()
         mode_display_values = get_text('modes')
-        mode_values = ['size', 'resolution', 'date', 'format', 'duplicate']
+        mode_values = ['size', 'resolution', 'date', 'format', 'duplicate', 'composite', 'color', 'verify']
         
         self.mode_combo['values'] = mode_display_values
         
@@ -617,7 +1591,7 @@ class ImageOrganizerGUI:
         mode_display = self.mode_combo.get()
         
         # 映射显示文本到内部值
-        mode_mapping = dict(zip(get_text('modes'), ['size', 'resolution', 'date', 'format', 'duplicate']))
+        mode_mapping = dict(zip(get_text('modes'), ['size', 'resolution', 'date', 'format', 'duplicate', 'composite', 'color', 'verify']))
         internal_mode = mode_mapping.get(mode_display, 'size')
         
         row = 0
@@ -648,6 +1622,46 @@ class ImageOrganizerGUI:
             self.max_files = tk.StringVar(value="0")
             ttk.Entry(self.param_frame, textvariable=self.max_files, width=10).grid(row=row, column=3)
             
+        elif internal_mode == 'composite':
+            ttk.Label(self.param_frame, text=get_text('composite_keys')).grid(row=row, column=0, sticky=tk.W)
+            self.composite_keys = tk.StringVar(value="format,date,resolution")
+            ttk.Entry(self.param_frame, textvariable=self.composite_keys, width=25).grid(row=row, column=1, padx=5)
+
+            ttk.Label(self.param_frame, text=get_text('max_files')).grid(row=row, column=2, sticky=tk.W, padx=10)
+            self.max_files = tk.StringVar(value="0")
+            ttk.Entry(self.param_frame, textvariable=self.max_files, width=10).grid(row=row, column=3)
+
+            ttk.Label(self.param_frame, text=get_text('folder_template')).grid(row=row+1, column=0, sticky=tk.W)
+            self.folder_template = tk.StringVar(value="")
+            ttk.Entry(self.param_frame, textvariable=self.folder_template, width=25).grid(row=row+1, column=1, padx=5)
+
+            self.include_archives = tk.BooleanVar(value=False)
+            ttk.Checkbutton(self.param_frame, text=get_text('include_archives'),
+                           variable=self.include_archives).grid(row=row+1, column=2, columnspan=2, sticky=tk.W, padx=10)
+
+            from tkinter import Label
+            tooltip_label = Label(self.param_frame, text=get_text('composite_tooltip'),
+                                 fg="gray", font=("Arial", 8), wraplength=400, justify=tk.LEFT)
+            tooltip_label.grid(row=row+2, column=0, columnspan=4, sticky=tk.W, pady=(2, 5))
+
+        elif internal_mode == 'color':
+            ttk.Label(self.param_frame, text=get_text('color_clusters')).grid(row=row, column=0, sticky=tk.W)
+            self.color_clusters = tk.StringVar(value="8")
+            ttk.Entry(self.param_frame, textvariable=self.color_clusters, width=10).grid(row=row, column=1, padx=5)
+
+            ttk.Label(self.param_frame, text=get_text('max_files')).grid(row=row, column=2, sticky=tk.W, padx=10)
+            self.max_files = tk.StringVar(value="0")
+            ttk.Entry(self.param_frame, textvariable=self.max_files, width=10).grid(row=row, column=3)
+
+        elif internal_mode == 'verify':
+            ttk.Label(self.param_frame, text=get_text('verify_timeout')).grid(row=row, column=0, sticky=tk.W)
+            self.verify_timeout = tk.StringVar(value="30")
+            ttk.Entry(self.param_frame, textvariable=self.verify_timeout, width=10).grid(row=row, column=1, padx=5)
+
+            self.move_corrupt = tk.BooleanVar(value=True)
+            ttk.Checkbutton(self.param_frame, text=get_text('move_corrupt'),
+                           variable=self.move_corrupt).grid(row=row, column=2, sticky=tk.W, padx=10)
+
         elif internal_mode == 'duplicate':
             self.move_duplicates = tk.BooleanVar(value=True)
             ttk.Checkbutton(self.param_frame, text=get_text('move_duplicates'), 
@@ -656,6 +1670,10 @@ class ImageOrganizerGUI:
             ttk.Label(self.param_frame, text=get_text('max_files')).grid(row=row, column=0, sticky=tk.W)
             self.max_files = tk.StringVar(value="0")
             ttk.Entry(self.param_frame, textvariable=self.max_files, width=10).grid(row=row, column=1, padx=5)
+
+            self.include_archives = tk.BooleanVar(value=False)
+            ttk.Checkbutton(self.param_frame, text=get_text('include_archives'),
+                           variable=self.include_archives).grid(row=row, column=2, sticky=tk.W, padx=10)
     
     def on_mode_change(self, event):
         """模式改变时的回调"""
@@ -674,7 +1692,7 @@ class ImageOrganizerGUI:
             return
             
         # 获取参数
-        mode_mapping = dict(zip(get_text('modes'), ['size', 'resolution', 'date', 'format', 'duplicate']))
+        mode_mapping = dict(zip(get_text('modes'), ['size', 'resolution', 'date', 'format', 'duplicate', 'composite', 'color', 'verify']))
         selected_mode = mode_mapping.get(self.mode_combo.get(), 'size')
         
         params = {
@@ -696,6 +1714,29 @@ class ImageOrganizerGUI:
             except ValueError:
                 messagebox.showerror(get_text('error'), get_text('invalid_number'))
                 return
+        elif selected_mode == 'composite':
+            try:
+                params['max_files_per_folder'] = int(self.max_files.get())
+            except ValueError:
+                messagebox.showerror(get_text('error'), get_text('invalid_number'))
+                return
+            params['keys'] = self.composite_keys.get()
+            params['folder_template'] = self.folder_template.get().strip() or None
+            params['include_archives'] = self.include_archives.get()
+        elif selected_mode == 'color':
+            try:
+                params['color_clusters'] = int(self.color_clusters.get())
+                params['max_files_per_folder'] = int(self.max_files.get())
+            except ValueError:
+                messagebox.showerror(get_text('error'), get_text('invalid_number'))
+                return
+        elif selected_mode == 'verify':
+            try:
+                params['timeout'] = float(self.verify_timeout.get())
+            except ValueError:
+                messagebox.showerror(get_text('error'), get_text('invalid_number'))
+                return
+            params['move_to_folder'] = self.move_corrupt.get()
         elif selected_mode == 'duplicate':
             params['move_to_folder'] = self.move_duplicates.get()
         else:
@@ -704,8 +1745,10 @@ class ImageOrganizerGUI:
             except ValueError:
                 messagebox.showerror(get_text('error'), get_text('invalid_number'))
                 return
+            params['include_archives'] = self.include_archives.get()
         
         # 在新线程中运行整理操作
+        self.organizer.stop_requested = False
         self.progress.start()
         self.start_button.config(state=tk.DISABLED)
         self.thread = threading.Thread(target=self.run_organization, args=(params,))
@@ -750,6 +1793,27 @@ class ImageOrganizerGUI:
         messagebox.showinfo(get_text('menu_help'), get_text('help_content'))
 
 def main():
+    parser = argparse.ArgumentParser(description=get_text('title'))
+    parser.add_argument('--serve', action='store_true', help='以本地服务模式运行，通过 HTTP/JSON 接收整理任务')
+    parser.add_argument('--host', default='127.0.0.1', help='服务监听地址')
+    parser.add_argument('--port', type=int, default=8765, help='服务监听端口')
+    parser.add_argument('--max-jobs', type=int, default=2, help='同时运行的任务数')
+    parser.add_argument('--queue-size', type=int, default=16, help='等待队列长度')
+    parser.add_argument('--io-concurrency', type=int, default=4, help='全局磁盘I/O并发数')
+    parser.add_argument('--token', default=os.environ.get('IMAGE_ORGANIZER_TOKEN'),
+                        help='服务访问令牌，默认每次启动随机生成（也可用环境变量 IMAGE_ORGANIZER_TOKEN 指定）')
+    args = parser.parse_args()
+
+    if args.serve:
+        daemon = OrganizerDaemon(host=args.host, port=args.port, max_jobs=args.max_jobs,
+                                 queue_size=args.queue_size, io_concurrency=args.io_concurrency,
+                                 token=args.token)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("整理服务已停止")
+        return
+
     root = tk.Tk()
     app = ImageOrganizerGUI(root)
     root.mainloop()